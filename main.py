@@ -1,197 +1,376 @@
+import atexit
+import hashlib
+import hmac
+import itertools
 import json
-import random
+import math
+import mmap
+import os
+import re
+import secrets
 import string
-from pathlib import Path
+import time
+
+try:                                              # orjson is much faster but optional; fall back to the json module
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+
+    def _dumps_line(obj):                         # Newline added by orjson itself, no extra concatenated copy
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def _dumps_line(obj):
+        return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+    def _loads(data):                             # json cannot parse a memoryview, so copy it into bytes first
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def _write_all(file, data):                       # Unbuffered files may take fewer bytes than asked for
+    written = file.write(data)
+    while written < len(data):
+        written += file.write(data[written:])
+
+_PIN_RE = re.compile(r"\d{4}", re.ASCII)         # Exactly four ASCII digits
+_AGE_RE = re.compile(r"\d{1,3}", re.ASCII)       # A whole number, checked before int() so bad input cannot crash
+
+_ID_CHARS = {"a": string.ascii_letters, "d": string.digits, "s": "!@#$%^&*()"}
+_ID_LAYOUTS = sorted(set(itertools.permutations("aaadddss")))   # Every order of 3 letters, 3 digits and 2 special characters
+_ID_SPACE = len(_ID_LAYOUTS) * math.prod(len(_ID_CHARS[kind]) for kind in _ID_LAYOUTS[0])
 
 
 class Bank:                                       # Bank class to handle banking operations
-    database_path = "data.json"                   # Path to the database file
-    data = []                                     # List to hold account info
+    __slots__ = ("database_path", "log_path", "data", "_pending", "_unsynced", "_last_sync", "_log")   # Per-instance state, stored in slots instead of a __dict__
+    log_limit = 1024 * 1024                       # Log size in bytes after which the database file is rewritten
+    sync_every = 32                               # Logged changes after which flush() also fsyncs the log
+    sync_interval = 0.5                           # Seconds after which flush() fsyncs the log regardless of count
     
     
-    try:                                          # Load existing info from the database file if it exists(try block)
-        if Path(database_path).exists():          # Check if the database file exists
-            with open(database_path, "r") as file: # Open the database file in read mode
-                data = json.loads(file.read())        # Load the info from the file into the data list
-        else:
-            print(f"Database file not found at {database_path}, creating a new one.")
-    except:                                       # Handle exceptions that may occur during file operations
-        print(f"An exception occurred while loading the database file {database_path}")
+    def __init__(self, database_path="data.json", log_path="data.log"):
+        self.database_path = database_path        # Path to the database file
+        self.log_path = log_path                  # Path to the log of changes made since the database file was written
+        self.data = {}                            # Account info keyed by account number
+        self._pending = bytearray()               # Log lines not yet written to the log file
+        self._unsynced = 0                        # Logged changes not yet fsynced to disk
+        self._last_sync = time.monotonic()
+        self._log = None                          # Log file handle, opened on the first flush and then reused
+        self.__load_database()
+        atexit.register(self.sync)                # Backstop for changes still queued when the program exits without close()
         
+    def __load_database(self):                    # Load existing info from the database file and the change log
+        data = {}
+        try:                                      # Opening directly is one syscall; checking exists() first would be two
+            with open(self.database_path, "rb") as file:
+                if os.fstat(file.fileno()).st_size:   # An empty file cannot be mapped and simply means no accounts
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                        data = {user['accountNo']: user for user in _loads(view)}   # Parse straight from the mapped pages and index by account number
+        except FileNotFoundError:
+            print(f"Database file not found at {self.database_path}, creating a new one.")
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"An exception occurred while loading the database file {self.database_path}: {e}")
+            
+        try:                                      # Replay the changes logged on top of the database file
+            with open(self.log_path, "r+b") as file:
+                replayed = 0                      # Bytes of complete lines read so far
+                for line in file:
+                    if not line.endswith(b"\n"):  # Last line was cut short while being written
+                        file.truncate(replayed)   # Drop the torn tail so new changes do not get appended onto it
+                        break
+                    replayed += len(line)
+                    try:
+                        entry = _loads(line)
+                    except json.JSONDecodeError as e:   # A damaged complete line is skipped but left in the file
+                        print(f"Skipping a damaged line in the change log {self.log_path}: {e}")
+                        continue
+                    if entry['op'] == "put":
+                        data[entry['account']['accountNo']] = entry['account']
+                    else:
+                        data.pop(entry['accountNo'], None)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"An exception occurred while loading the change log {self.log_path}: {e}")
+            
+        for user in data.values():                # Older records kept the balance in rupees as a float
+            if 'balance' in user:
+                user['balancePaise'] = round(user.pop('balance') * 100)
+        self.data = data
         
-    @staticmethod
-    def __update_database():
-        with open(Bank.database_path, "w") as file:
-            file.write(json.dumps(Bank.data, indent=4))
+    def __update_database(self):                  # Rewrite the database file, which makes the log redundant
+        temp_path = self.database_path + ".tmp"
+        with open(temp_path, "wb", buffering=0) as file:   # Write a complete copy next to the old file first
+            _write_all(file, _dumps(list(self.data.values())))   # Compact JSON built in memory and written in one call
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.database_path) # Atomic rename, so a crash leaves either the old or the new file
+        directory = os.open(os.path.dirname(os.path.abspath(self.database_path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)                   # Make the rename durable before the log it replaces is emptied
+        finally:
+            os.close(directory)
+        self._log.truncate(0)
+        self._unsynced = 0                        # Everything logged so far is now in the fsynced snapshot
+            
+    def __log_change(self, entry):                # Queue a single change instead of rewriting every account
+        self._pending += _dumps_line(entry)
+        self._unsynced += 1
+            
+    def flush(self, sync=False):                  # Append all queued changes to the log in one write
+        if not self._pending and not (sync and self._unsynced):
+            return
+        if self._log is None:
+            self._log = open(self.log_path, "ab", buffering=0)   # Unbuffered: the queue is already one complete buffer
+        _write_all(self._log, self._pending)
+        if sync or self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            os.fsync(self._log.fileno())          # One fsync covers every change written since the last one
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+        size = self._log.tell()
+        self._pending.clear()
+        if size > self.log_limit:
+            self.__update_database()
+            
+    def sync(self):                               # Flush and always fsync, so every change so far survives a crash
+        self.flush(sync=True)
+            
+    def close(self):                              # Sync every change and release the log file handle
+        self.sync()
+        atexit.unregister(self.sync)              # Nothing left for the exit hook, and it no longer keeps this Bank alive
+        if self._log is not None:
+            self._log.close()
+            self._log = None
             
     @classmethod
     def __account_number_generator(cls):
-        alpha = random.choices(string.ascii_letters, k=3)
-        digit = random.choices(string.digits, k=3)
-        special_char = random.choices("!@#$%^&*()", k=2)
-        id = alpha + digit + special_char
-        random.shuffle(id)
+        n, layout = divmod(secrets.randbelow(_ID_SPACE), len(_ID_LAYOUTS))   # One draw from the OS random source covers the whole id
+        id = []
+        for kind in _ID_LAYOUTS[layout]:
+            n, i = divmod(n, len(_ID_CHARS[kind]))
+            id.append(_ID_CHARS[kind][i])
         return "".join(id)
     
+    @staticmethod
+    def __to_paise(amount):                       # Parse a rupee amount typed by the user into whole paise, or None if it is not a number
+        try:
+            amount = float(amount)
+        except ValueError:
+            return None
+        amount *= 100
+        if not math.isfinite(amount):             # inf, nan and amounts that overflow once scaled have no paise value
+            return None
+        return round(amount)
     
+    @staticmethod
+    def __from_paise(paise):                      # Format whole paise as rupees for display
+        return f"{paise // 100}.{paise % 100:02d}"
     
+    @staticmethod
+    def __print_account(user):
+        for i in user:
+            if i == 'pin' or i == 'salt':
+                continue
+            if i == 'balancePaise':
+                print(f"balance: {Bank.__from_paise(user[i])}")
+            else:
+                print(f"{i}: {user[i]}")
     
+    @staticmethod
+    def __hash_pin(pin, salt):
+        return hashlib.scrypt(pin.encode(), salt=bytes.fromhex(salt), n=2**14, r=8, p=1, dklen=32).hex()
     
-    def Create_account(self):
+    def __find_account(self, acc_no, pin):
+        user = self.data.get(acc_no)                # Direct lookup instead of scanning every account
+        if user is None:
+            return None
+        if 'salt' not in user:                     # Account saved before PINs were hashed
+            if not hmac.compare_digest(str(user['pin']).encode(), pin.encode()):   # Bytes, so a non-ASCII PIN is just a failed login
+                return None
+            user['salt'] = os.urandom(16).hex()    # Replace the plain PIN with its hash on first login
+            user['pin'] = Bank.__hash_pin(pin, user['salt'])
+            self.__log_change({"op": "put", "account": user})
+        elif not hmac.compare_digest(user['pin'], Bank.__hash_pin(pin, user['salt'])):   # Constant-time PIN check
+            return None
+        return user
+    
+    
+    
+    
+    def __open_account(self, name, age, email, pin):   # Store a new account, or return None if the details are not eligible
+        age = str(age)
+        if not isinstance(pin, str):               # A PIN given as an int would already have lost any leading zero
+            return None
+        if _AGE_RE.fullmatch(age) is None or int(age) < 18 or _PIN_RE.fullmatch(pin) is None:
+            return None
+        
+        acc_no = Bank.__account_number_generator()
+        while acc_no in self.data:                 # Draw again if the number already belongs to an account
+            acc_no = Bank.__account_number_generator()
+        
+        salt = os.urandom(16).hex()                # Only the salted hash of the PIN is stored
         info = {
-            "name": input("Tell your name:- "),
-            "age": int(input("Tell your age:- ")),
-            "email": input("Tell your email:-"),
-            "pin": int(input("Tell your 4 no pin:- ")),
-            "accountNo": Bank.__account_number_generator(),
-            "balance": 0
+            "name": name,
+            "age": int(age),
+            "email": email,
+            "pin": Bank.__hash_pin(pin, salt),
+            "accountNo": acc_no,
+            "balancePaise": 0,                     # Balance is kept in whole paise to avoid float rounding
+            "salt": salt
             }
+        self.data[acc_no] = info
+        self.__log_change({"op": "put", "account": info})
+        return info
         
-        if info['age'] < 18 or len(str(info['pin'])) != 4:
+    def Create_account(self):
+        name = input("Tell your name:- ")
+        age = input("Tell your age:- ").strip()
+        email = input("Tell your email:-")
+        pin = input("Tell your 4 no pin:- ").strip()   # Kept as text so a PIN like 0123 keeps its leading zero
+        
+        info = self.__open_account(name, age, email, pin)
+        if info is None:
             print("Sorry, yor are not eligible to create an account.")
         else:
             print("Account- created successfully.")
-            for i in info:
-                print(f"{i}: {info[i]}")
+            Bank.__print_account(info)
             print("Please note down your account number for future reference.")
-            Bank.data.append(info)
             
-            Bank.__update_database()
+    def Create_account_batch(self, accounts):     # Open accounts from (name, age, email, pin) rows without prompting; pin must be a 4-digit string
+        created = [self.__open_account(name, age, email, pin) for name, age, email, pin in accounts]
+        self.flush()                              # One log write for the whole batch
+        return created
             
     def deposit(self):
         acc_no = input("Enter your account number:- ")
-        pin = int(input("Enter your your pin:- "))
+        pin = input("Enter your your pin:- ").strip()
         
-        userdata = [user for user in Bank.data if user['accountNo'] == acc_no and user['pin'] == pin]     # Fetch user data matching account number and pin
+        userdata = self.__find_account(acc_no, pin)     # Fetch user data matching account number and pin
         
-        if userdata == False:
+        if userdata is None:
             print("Invalid account number or pin.")
         else:
-            amount = float(input("Enter the amount to be deposited:- "))
-            if amount > 100000 or amount <= 0:
+            amount = Bank.__to_paise(input("Enter the amount to be deposited:- "))
+            if amount is None or amount > 100000 * 100 or amount <= 0:
                 print("Invalid amount.")
             else:
-                userdata[0]['balance'] += amount
-                print(f"Amount {amount} deposited successfully. New balance is {userdata[0]['balance']}.")
-                Bank.__update_database()
+                userdata['balancePaise'] += amount
+                print(f"Amount {Bank.__from_paise(amount)} deposited successfully. New balance is {Bank.__from_paise(userdata['balancePaise'])}.")
+                self.__log_change({"op": "put", "account": userdata})
         
         
     def withdraw(self):
         acc_no = input("Enter your account number:- ")
-        pin = int(input("Enter your your pin:- "))
+        pin = input("Enter your your pin:- ").strip()
         
-        userdata = [user for user in Bank.data if user['accountNo'] == acc_no and user['pin'] == pin]     # Fetch user data matching account number and pin
+        userdata = self.__find_account(acc_no, pin)     # Fetch user data matching account number and pin
         
-        if userdata == False:
+        if userdata is None:
             print("Invalid account number or pin.")
         else:
-            amount = float(input("Enter the amount to be withdrawn:- "))
-            if userdata[0]['balance'] < amount:
+            amount = Bank.__to_paise(input("Enter the amount to be withdrawn:- "))
+            if amount is None or amount <= 0:
+                print("Invalid amount.")
+            elif userdata['balancePaise'] < amount:
                 print("Insufficient balance.")
             else:
-                userdata[0]['balance'] -= amount
-                print(f"Amount {amount} withdrawn successfully. New balance is {userdata[0]['balance']}.")
-                Bank.__update_database()
+                userdata['balancePaise'] -= amount
+                print(f"Amount {Bank.__from_paise(amount)} withdrawn successfully. New balance is {Bank.__from_paise(userdata['balancePaise'])}.")
+                self.__log_change({"op": "put", "account": userdata})
         
                 
     def details(self):
         acc_no = input("Enter your account number:- ")
-        pin = int(input("Enter your your pin:- "))
+        pin = input("Enter your your pin:- ").strip()
         
-        userdata = [user for user in Bank.data if user['accountNo'] == acc_no and user['pin'] == pin]
+        userdata = self.__find_account(acc_no, pin)
         
-        print("Your account details are:- \n \n")
-        for i in userdata[0]:
-            print (f"{i}: {userdata[0][i]}")
+        if userdata is None:
+            print("Invalid account number or pin.")
+        else:
+            print("Your account details are:- \n \n")
+            Bank.__print_account(userdata)
             
     def update_details(self):
         acc_no = input("Enter your account number:- ")
-        pin = int(input("Enter your your pin:- "))
+        pin = input("Enter your your pin:- ").strip()
         
-        userdata = [user for user in Bank.data if user['accountNo'] == acc_no and user['pin'] == pin]
+        userdata = self.__find_account(acc_no, pin)
         
-        if userdata == False:
+        if userdata is None:
             print("Invalid account number or pin.")
         else:
             print("You cant update your account number, age and balance.")
             
             print("Fill the details you want to update or leave it blank press enter:- ")
             
-            new_data = {
-                "name": input("Enter your name:- "),
-                "email": input("Enter your email:- "),
-                "pin": input("Enter your 4 no pin:- "),
-            }
-            
-            if new_data['name'] == "":
-                new_data['name'] == userdata[0]['name']
-            if new_data['email'] == "":
-                new_data['email'] == userdata[0]['email']    
-            if new_data['pin'] == "":
-                new_data['pin'] == userdata[0]['pin']
+            name = input("Enter your name:- ")
+            email = input("Enter your email:- ")
+            new_pin = input("Enter your 4 no pin:- ").strip()
             
-            new_data['age'] = userdata[0]['age']
-            new_data['accountNo'] = userdata[0]['accountNo']
-            new_data['balance'] = userdata[0]['balance']
-            
-            if type(new_data['pin']) == str:
-                new_data['pin'] = int(new_data['pin'])
-                    
-                for i in new_data:
-                    if new_data[i] == userdata[0][i]:
-                        continue
-                    else:
-                        userdata[0][i] = new_data[i]
-                        
+            if new_pin != "" and _PIN_RE.fullmatch(new_pin) is None:
+                print("Invalid pin, it must be 4 digits.")
+            else:
+                if name != "":                     # Blank answers keep the current value
+                    userdata['name'] = name
+                if email != "":
+                    userdata['email'] = email
+                if new_pin != "":
+                    userdata['salt'] = os.urandom(16).hex()
+                    userdata['pin'] = Bank.__hash_pin(new_pin, userdata['salt'])
+                
                 print("Details updated successfully.")
-                Bank.__update_database()
+                self.__log_change({"op": "put", "account": userdata})
         
     def delete_account(self):
         acc_no = input("Enter your account number:- ")
-        pin = int(input("Enter your your pin:- "))
+        pin = input("Enter your your pin:- ").strip()
         
-        userdata = [user for user in Bank.data if user['accountNo'] == acc_no and user['pin'] == pin]
+        userdata = self.__find_account(acc_no, pin)
         
-        if userdata == False:
+        if userdata is None:
             print("Invalid account number or pin.")
         else:
             check = input("Are you sure you want to delete your account? (y/n):- ")
             if check == "n" or check == "N":
                 print("Bypassed")
             else:
-                index = Bank.data.index(userdata[0])
-                Bank.data.pop(index)
+                del self.data[userdata['accountNo']]
                 print("Account deleted successfully.")
-                Bank.__update_database()
+                self.__log_change({"op": "delete", "accountNo": userdata['accountNo']})
         
         
 
 
-user = Bank()
-print("Press 1 For Creating an account")
-print("Press 2 for Depositing the Money in the bank")
-print("Press 3 For Withdrawing the money")
-print("Press 4 for details")
-print("Press 5 for updating details")
-print("Press 6 for deleting your account")
-
+def main():
+    user = Bank()
+    print("Press 1 For Creating an account")
+    print("Press 2 for Depositing the Money in the bank")
+    print("Press 3 For Withdrawing the money")
+    print("Press 4 for details")
+    print("Press 5 for updating details")
+    print("Press 6 for deleting your account")
+    
+    actions = {                                   # Menu choice -> method that handles it
+        "1": user.Create_account,
+        "2": user.deposit,
+        "3": user.withdraw,
+        "4": user.details,
+        "5": user.update_details,
+        "6": user.delete_account,
+    }
 
-check = int(input("Tell your response :-"))
+    try:
+        check = input("Tell your response :-").strip()
+        action = actions.get(check)
+        if action is None:
+            print("Invalid option.")
+        else:
+            action()
+    finally:
+        user.close()                              # The change is on disk before main() returns, not only at interpreter exit
 
-if check == 1:
-    user.Create_account()
 
-if check == 2:
-    user.deposit()
-    
-if check == 3:
-    user.withdraw()
-    
-if check == 4:
-    user.details()
-    
-if check == 5:
-    user.update_details()
-    
-if check == 6:
-    user.delete_account()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
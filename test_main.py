@@ -0,0 +1,141 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from main import Bank
+
+
+class BankTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.database_path = os.path.join(self.tmp.name, "data.json")
+        self.log_path = os.path.join(self.tmp.name, "data.log")
+
+    def open_bank(self):
+        bank = Bank(self.database_path, self.log_path)
+        self.addCleanup(bank.close)
+        return bank
+
+    def answer(self, action, *answers):           # Run an interactive action with scripted input and return what it printed
+        output = io.StringIO()
+        with mock.patch("builtins.input", side_effect=answers), contextlib.redirect_stdout(output):
+            action()
+        return output.getvalue()
+
+    def test_change_after_torn_log_line_survives_restart(self):
+        bank = self.open_bank()
+        first, = bank.Create_account_batch([("a", 30, "a@example.com", "1234")])
+        bank.sync()
+        with open(self.log_path, "ab") as file:   # Simulate a crash halfway through writing a line
+            file.write(b'{"op":"put","acc')
+
+        bank = self.open_bank()
+        self.assertIn(first['accountNo'], bank.data)
+        second, = bank.Create_account_batch([("b", 40, "b@example.com", "5678")])
+        bank.sync()
+
+        bank = self.open_bank()
+        self.assertIn(first['accountNo'], bank.data)
+        self.assertIn(second['accountNo'], bank.data)
+
+    def test_damaged_line_inside_log_keeps_later_changes(self):
+        bank = self.open_bank()
+        first, = bank.Create_account_batch([("a", 30, "a@example.com", "1234")])
+        bank.sync()
+        with open(self.log_path, "ab") as file:
+            file.write(b'{"op":"put","acc\n')
+        second, = bank.Create_account_batch([("b", 40, "b@example.com", "5678")])
+        bank.sync()
+        size = os.path.getsize(self.log_path)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            bank = self.open_bank()
+        self.assertIn("damaged line", output.getvalue())
+        self.assertIn(first['accountNo'], bank.data)
+        self.assertIn(second['accountNo'], bank.data)
+        self.assertEqual(os.path.getsize(self.log_path), size)
+
+    def write_legacy_database(self):             # Same layout as the shipped data.json: plain int PIN, balance in rupees
+        with open(self.database_path, "w") as file:
+            json.dump([{"name": "a", "age": 30, "email": "a@example.com", "pin": 4563, "accountNo": "1234", "balance": 100.1}], file)
+
+    def test_legacy_balance_loads_as_paise(self):
+        self.write_legacy_database()
+        bank = self.open_bank()
+        self.assertEqual(bank.data["1234"]['balancePaise'], 10010)
+        self.assertNotIn('balance', bank.data["1234"])
+
+    def test_legacy_pin_is_checked_and_upgraded_on_login(self):
+        self.write_legacy_database()
+        bank = self.open_bank()
+        self.assertIn("Invalid account number or pin.", self.answer(bank.details, "1234", "1111"))
+        self.assertEqual(bank.data["1234"]['pin'], 4563)
+
+        self.assertIn("Your account details are", self.answer(bank.details, "1234", "4563"))
+        bank.sync()
+        with open(self.log_path, "rb") as file:
+            entry = json.loads(file.readlines()[-1])
+        self.assertEqual(entry['op'], "put")
+        self.assertIn('salt', entry['account'])
+        self.assertNotEqual(entry['account']['pin'], 4563)
+        self.assertNotIn("4563", entry['account']['pin'])
+
+        bank = self.open_bank()                   # The hashed PIN is now checked through scrypt
+        self.assertIn("Your account details are", self.answer(bank.details, "1234", "4563"))
+        self.assertIn("Invalid account number or pin.", self.answer(bank.details, "1234", "4564"))
+
+    def test_update_details_changes_pin(self):
+        bank = self.open_bank()
+        user, = bank.Create_account_batch([("a", 30, "a@example.com", "1234")])
+        self.assertIn("Details updated successfully.", self.answer(bank.update_details, user['accountNo'], "1234", "", "", "9876"))
+        bank.sync()
+
+        bank = self.open_bank()
+        self.assertIn("Invalid account number or pin.", self.answer(bank.details, user['accountNo'], "1234"))
+        self.assertIn("Your account details are", self.answer(bank.details, user['accountNo'], "9876"))
+
+    def test_age_and_pin_answers_are_stripped(self):
+        bank = self.open_bank()
+        output = self.answer(bank.Create_account, "a", "30 ", "a@example.com", " 1234 ")
+        self.assertIn("Account- created successfully.", output)
+        acc_no, = bank.data
+        self.assertIn("Your account details are", self.answer(bank.details, acc_no, " 1234"))
+        self.assertIn("Details updated successfully.", self.answer(bank.update_details, acc_no, "1234 ", "", "", " 9876 "))
+        self.assertIn("Your account details are", self.answer(bank.details, acc_no, "9876"))
+
+    def test_create_account_batch(self):
+        bank = self.open_bank()
+        created = bank.Create_account_batch([
+            ("a", 30, "a@example.com", "0123"),
+            ("b", "45", "b@example.com", "9876"),
+            ("c", 30, "c@example.com", 1234),     # PIN not given as a string
+            ("d", 17, "d@example.com", "1111"),   # Under age
+            ("e", 30, "e@example.com", "12a4"),
+        ])
+        self.assertIsNotNone(created[0])
+        self.assertIsNotNone(created[1])
+        self.assertEqual(created[2:], [None, None, None])
+        self.assertEqual(created[1]['age'], 45)
+        self.assertEqual(created[0]['balancePaise'], 0)
+        self.assertNotEqual(created[0]['pin'], "0123")
+
+        bank = self.open_bank()                   # The batch was written to the log without an explicit sync
+        self.assertEqual(sorted(bank.data), sorted(user['accountNo'] for user in created[:2]))
+
+    def test_deposit_and_withdraw_reject_amounts_without_a_paise_value(self):
+        bank = self.open_bank()
+        user, = bank.Create_account_batch([("a", 30, "a@example.com", "1234")])
+        for amount in ("inf", "nan", "1e400", "1e307", "abc"):
+            self.assertIn("Invalid amount.", self.answer(bank.deposit, user['accountNo'], "1234", amount))
+            self.assertIn("Invalid amount.", self.answer(bank.withdraw, user['accountNo'], "1234", amount))
+        self.assertIn("deposited successfully", self.answer(bank.deposit, user['accountNo'], "1234", "12.5"))
+        self.assertEqual(user['balancePaise'], 1250)
+
+
+if __name__ == "__main__":
+    unittest.main()